@@ -0,0 +1,207 @@
+"""
+Shared cache tier used by all API workers
+
+The cache exposes a small Redis-compatible subset (get, set with ex/nx,
+delete, incr) so a Redis server can be used directly. Without Redis, a
+SQLite file acts as a local stand-in that every worker process on the
+same machine shares.
+"""
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CACHE_URL = os.getenv("CACHE_URL", "sqlite:///./cache.db")
+
+# Purge expired rows from the SQLite stand-in every N writes
+PURGE_EVERY = 100
+
+# Redis script deleting a key only while it still holds the given value
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SQLiteCache:
+    """Redis-compatible key/value cache stored in a SQLite file"""
+
+    def __init__(self, path: str = "./cache.db"):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Open one connection per thread and process
+
+        sqlite3 connections cannot be shared across threads, and must not
+        cross a fork either.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _purge_expired(self, conn: sqlite3.Connection, now: float):
+        """Delete expired rows every PURGE_EVERY writes, as Redis would expire them"""
+        self._writes += 1
+        if self._writes % PURGE_EVERY == 0:
+            conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the value for key, or None if missing or expired"""
+        row = self._connection().execute(
+            "SELECT value FROM cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value, ex: Optional[int] = None, nx: bool = False) -> bool:
+        """
+        Store value under key
+
+        Args:
+            key: Cache key
+            value: Value to store (stored as text)
+            ex: Expiry in seconds
+            nx: Only set if the key does not already exist
+
+        Returns:
+            True if the value was stored
+        """
+        conn = self._connection()
+        now = time.time()
+        expires_at = now + ex if ex else None
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if nx:
+                conn.execute(
+                    "DELETE FROM cache WHERE key = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+                    (key, now)
+                )
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, str(value), expires_at)
+                )
+                stored = cursor.rowcount == 1
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, str(value), expires_at)
+                )
+                stored = True
+            self._purge_expired(conn, now)
+            conn.execute("COMMIT")
+            return stored
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, *keys: str) -> int:
+        """Delete keys and return how many existed"""
+        if not keys:
+            return 0
+        placeholders = ", ".join("?" for _ in keys)
+        cursor = self._connection().execute(
+            f"DELETE FROM cache WHERE key IN ({placeholders})", keys
+        )
+        return cursor.rowcount
+
+    def delete_if_equals(self, key: str, value: str) -> bool:
+        """Delete key only if it currently holds value"""
+        cursor = self._connection().execute(
+            "DELETE FROM cache WHERE key = ? AND value = ?", (key, value)
+        )
+        return cursor.rowcount == 1
+
+    def incr(self, key: str) -> int:
+        """Atomically increment an integer counter and return the new value"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time())
+            ).fetchone()
+            value = int(row[0]) + 1 if row else 1
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, NULL)",
+                (key, str(value))
+            )
+            conn.execute("COMMIT")
+            return value
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+def get_cache(cache_url: str = CACHE_URL):
+    """
+    Create the shared cache client for the configured CACHE_URL
+
+    redis:// URLs use the redis package (optional dependency); sqlite:///
+    URLs use the SQLite stand-in.
+    """
+    if cache_url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("CACHE_URL points to Redis but the 'redis' package is not installed")
+        return redis.Redis.from_url(cache_url, decode_responses=True)
+
+    if cache_url.startswith("sqlite:///"):
+        return SQLiteCache(cache_url[len("sqlite:///"):])
+
+    raise ValueError(f"Unsupported CACHE_URL: {cache_url}")
+
+
+def acquire_lock(cache, name: str, ttl: int) -> Optional[str]:
+    """
+    Try to take a cross-worker lock for ttl seconds
+
+    Returns:
+        An owner token for exactly one worker until the lock expires or is
+        released, otherwise None
+    """
+    token = f"{os.getpid()}:{uuid.uuid4().hex}"
+    if cache.set(f"lock:{name}", token, ex=ttl, nx=True):
+        return token
+    return None
+
+
+def release_lock(cache, name: str, token: str):
+    """Release a lock taken with acquire_lock, only if this owner still holds it"""
+    if isinstance(cache, SQLiteCache):
+        cache.delete_if_equals(f"lock:{name}", token)
+    else:
+        cache.eval(RELEASE_SCRIPT, 1, f"lock:{name}", token)
+
+
+def is_locked(cache, name: str) -> bool:
+    """Check whether another worker currently holds a lock"""
+    return cache.get(f"lock:{name}") is not None
+
+
+def get_data_version(cache) -> str:
+    """Return the current stock data version used to key result caches"""
+    return cache.get("data_version") or "0"
+
+
+def bump_data_version(cache) -> int:
+    """Invalidate cached results after stock data changes"""
+    return cache.incr("data_version")
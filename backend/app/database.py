@@ -37,13 +37,18 @@ def init_db():
     Base.metadata.create_all(bind=engine)
 
 
-def seed_sample_data():
-    """Seed the database with sample stock data if it's empty"""
+def seed_sample_data() -> bool:
+    """
+    Seed the database with sample stock data if it's empty
+    
+    Returns:
+        True if rows were inserted
+    """
     db: Session = SessionLocal()
     try:
         # Check if data already exists
         if db.query(Stock).first():
-            return
+            return False
 
         # Define symbols to fetch (Top ~100 stocks by market cap)
         symbols = [
@@ -67,8 +72,65 @@ def seed_sample_data():
         
         db.add_all(sample_stocks)
         db.commit()
+        return bool(sample_stocks)
     except Exception as e:
         print(f"Error seeding data: {e}")
         db.rollback()
+        return False
+    finally:
+        db.close()
+
+
+# Stock fields updated in place by a refresh
+REFRESH_FIELDS = [
+    "company_name", "sector", "industry", "price", "market_cap",
+    "volume", "pe_ratio", "dividend_yield"
+]
+
+
+def refresh_stock_data(on_change=None) -> list[str]:
+    """
+    Re-fetch data for every stored symbol and update rows in place
+    
+    Args:
+        on_change: Optional callback(changed_symbols, db_session) run before
+            the commit, so its writes land in the same transaction as the
+            updated rows (a failure rolls both back and the next refresh
+            sees the same changes again)
+    
+    Returns:
+        Symbols whose data changed
+    """
+    db: Session = SessionLocal()
+    try:
+        stocks = db.query(Stock).all()
+        
+        from app.services import fetch_stock_data
+        fresh = {stock.symbol: stock for stock in fetch_stock_data([s.symbol for s in stocks])}
+        
+        changed = []
+        for stock in stocks:
+            new_stock = fresh.get(stock.symbol)
+            if new_stock is None:
+                continue
+            updated = False
+            for field in REFRESH_FIELDS:
+                value = getattr(new_stock, field)
+                if getattr(stock, field) != value:
+                    setattr(stock, field, value)
+                    updated = True
+            if updated:
+                changed.append(stock.symbol)
+        
+        if changed and on_change is not None:
+            db.flush()
+            on_change(changed, db)
+        
+        db.commit()
+        return changed
+    except Exception as e:
+        print(f"Error refreshing data: {e}")
+        db.rollback()
+        return []
     finally:
         db.close()
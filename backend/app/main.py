@@ -1,16 +1,40 @@
 """
 FastAPI main application
 """
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from app.schemas import QueryRequest, QueryResponse, HealthResponse
-from app.database import get_db, seed_sample_data
+from typing import List, Optional
+from app.schemas import (
+    QueryRequest, QueryResponse, HealthResponse,
+    SavedScreenRequest, SavedScreenResponse, ScreenDeltaResponse
+)
+from app.database import get_db, init_db, seed_sample_data, refresh_stock_data, SessionLocal
+from app.cache import get_cache, acquire_lock, release_lock, is_locked, bump_data_version
 from app.services.llm_parser import LLMParser
 from app.services.screener import Screener
 from app.services.runner import Runner
+from app.services.screen_tracker import ScreenTracker
+import asyncio
+import json
+import os
 import time
 
+# Seconds between background data refreshes (0 disables refreshing)
+REFRESH_INTERVAL = int(os.getenv("REFRESH_INTERVAL", "0"))
+
+# Upper bound on how long one worker may hold the seeding lock
+# (gunicorn.conf.py derives the worker timeout from the same setting)
+SEED_LOCK_TTL = int(os.getenv("SEED_TIMEOUT", "300"))
+
+# Upper bound on how long one refresh may run before another worker may start one
+REFRESH_LOCK_TTL = 3600
+
+# Seconds between checks for new deltas on a screen event stream
+SCREEN_EVENT_POLL_INTERVAL = 2
+
 app = FastAPI(
     title="AI Stock Retrieval API",
     description="Convert natural language queries to SQL and retrieve stock data",
@@ -26,20 +50,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-llm_parser = LLMParser()
+# Initialize services (each worker process gets its own instances,
+# but parse and result caches live in the shared cache tier)
+cache = get_cache()
+llm_parser = LLMParser(cache=cache)
 screener = Screener()
-runner = Runner()
+runner = Runner(cache=cache)
+screen_tracker = ScreenTracker()
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database and seed sample data on startup"""
+    """Initialize database and seed sample data on startup (one worker at a time)"""
     try:
-        seed_sample_data()
-        print("Database initialized and seeded with sample data.")
+        token = acquire_lock(cache, "seed", SEED_LOCK_TTL)
+        if token:
+            try:
+                # Seeding fetches from Yahoo Finance, so keep it off the event loop
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, init_db)
+                # Only new data invalidates cached results, not a worker restart
+                if await loop.run_in_executor(None, seed_sample_data):
+                    bump_data_version(cache)
+                print("Database initialized and seeded with sample data.")
+            finally:
+                release_lock(cache, "seed", token)
+        else:
+            # Don't serve requests until tables exist and data is seeded
+            print("Another worker is seeding the database, waiting.")
+            deadline = time.time() + SEED_LOCK_TTL
+            while is_locked(cache, "seed") and time.time() < deadline:
+                await asyncio.sleep(1)
     except Exception as e:
         print(f"Warning: Could not seed database: {e}")
+    
+    if REFRESH_INTERVAL > 0:
+        asyncio.create_task(refresh_loop())
+
+
+async def refresh_loop():
+    """Periodically refresh stock data; the lock lets one worker refresh per interval"""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(REFRESH_INTERVAL)
+        if not acquire_lock(cache, "refresh", REFRESH_INTERVAL):
+            continue
+        # A slow refresh must not overlap the next one once the interval lock expires
+        token = acquire_lock(cache, "refresh:running", REFRESH_LOCK_TTL)
+        if token is None:
+            continue
+        try:
+            # Saved screens are re-checked for the changed symbols in the refresh transaction
+            changed = await loop.run_in_executor(
+                None, lambda: refresh_stock_data(on_change=screen_tracker.reevaluate)
+            )
+            if changed:
+                bump_data_version(cache)
+            print(f"Refreshed stock data: {len(changed)} symbols changed")
+        except Exception as e:
+            print(f"Warning: Could not refresh data: {e}")
+        finally:
+            release_lock(cache, "refresh:running", token)
 
 
 @app.get("/api/health", response_model=HealthResponse)
@@ -62,7 +133,7 @@ async def process_query(request: QueryRequest, db: Session = Depends(get_db)):
     try:
         # Step 1: Parse natural language to JSON
         print(f"Parsing query: {request.query}")
-        parsed_json = llm_parser.parse(request.query)
+        parsed_json = await run_in_threadpool(llm_parser.parse, request.query)
         print(f"Parsed JSON: {parsed_json}")
         
         # Step 2: Convert JSON to SQL
@@ -88,6 +159,100 @@ async def process_query(request: QueryRequest, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 
+@app.post("/api/screens", response_model=SavedScreenResponse)
+async def create_screen(request: SavedScreenRequest, db: Session = Depends(get_db)):
+    """Parse a query once and save it as a screen with its current members"""
+    try:
+        parsed_json = await run_in_threadpool(llm_parser.parse, request.query)
+        return screen_tracker.create(request.name, request.query, parsed_json, db)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid screen: {str(e)}")
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=f"Execution error: {str(e)}")
+
+
+@app.get("/api/screens", response_model=List[SavedScreenResponse])
+async def list_screens(db: Session = Depends(get_db)):
+    """List saved screens with their current members"""
+    return screen_tracker.list_all(db)
+
+
+@app.get("/api/screens/{screen_id}", response_model=SavedScreenResponse)
+async def get_screen(screen_id: int, db: Session = Depends(get_db)):
+    """Return a saved screen's current members without re-running the query"""
+    screen = screen_tracker.get(screen_id, db)
+    if screen is None:
+        raise HTTPException(status_code=404, detail="Screen not found")
+    return screen
+
+
+@app.delete("/api/screens/{screen_id}")
+async def delete_screen(screen_id: int, db: Session = Depends(get_db)):
+    """Delete a saved screen"""
+    if not screen_tracker.delete(screen_id, db):
+        raise HTTPException(status_code=404, detail="Screen not found")
+    return {"deleted": screen_id}
+
+
+@app.get("/api/screens/{screen_id}/deltas", response_model=List[ScreenDeltaResponse])
+async def get_screen_deltas(screen_id: int, since: int = 0, db: Session = Depends(get_db)):
+    """Return membership deltas (entered/exited) recorded after delta id `since`"""
+    if screen_tracker.get(screen_id, db) is None:
+        raise HTTPException(status_code=404, detail="Screen not found")
+    return screen_tracker.deltas(screen_id, since, db)
+
+
+def poll_screen_deltas(screen_id: int, since_id: int) -> Optional[List[dict]]:
+    """
+    Fetch new deltas for a screen in a short-lived session
+    
+    Returns None once the screen no longer exists.
+    """
+    db = SessionLocal()
+    try:
+        if not screen_tracker.exists(screen_id, db):
+            return None
+        return screen_tracker.deltas(screen_id, since_id, db)
+    finally:
+        db.close()
+
+
+@app.get("/api/screens/{screen_id}/events")
+async def stream_screen_events(
+    screen_id: int,
+    since: int = 0,
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Push membership deltas for a saved screen as Server-Sent Events
+    
+    EventSource reconnects with the original URL, so the Last-Event-ID
+    header takes precedence over `since` to resume without replaying.
+    Streams never hold a database connection between polls, and end with
+    a "deleted" event when the screen is removed.
+    """
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+    
+    deltas = await run_in_threadpool(poll_screen_deltas, screen_id, since)
+    if deltas is None:
+        raise HTTPException(status_code=404, detail="Screen not found")
+    
+    async def event_stream(deltas):
+        last_id = since
+        while True:
+            if deltas is None:
+                yield f"event: deleted\ndata: {json.dumps({'screen_id': screen_id})}\n\n"
+                return
+            for delta in deltas:
+                last_id = delta["id"]
+                yield f"id: {delta['id']}\nevent: {delta['change']}\ndata: {json.dumps(delta)}\n\n"
+            await asyncio.sleep(SCREEN_EVENT_POLL_INTERVAL)
+            deltas = await run_in_threadpool(poll_screen_deltas, screen_id, last_id)
+    
+    return StreamingResponse(event_stream(deltas), media_type="text/event-stream")
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -1,7 +1,7 @@
 """
 Database models for stocks data
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, create_engine
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey, UniqueConstraint, create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -29,6 +29,43 @@ class Stock(Base):
         return f"<Stock(symbol={self.symbol}, price={self.price})>"
 
 
+class SavedScreen(Base):
+    """Saved screen storing a parsed query plan for re-evaluation"""
+    __tablename__ = "saved_screens"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    query = Column(String)
+    parsed_json = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # Last time re-evaluation changed this screen's membership
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<SavedScreen(id={self.id}, name={self.name})>"
+
+
+class ScreenMember(Base):
+    """A stock currently matching a saved screen"""
+    __tablename__ = "screen_members"
+    __table_args__ = (UniqueConstraint("screen_id", "symbol"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    screen_id = Column(Integer, ForeignKey("saved_screens.id"), index=True, nullable=False)
+    symbol = Column(String, index=True, nullable=False)
+
+
+class ScreenDelta(Base):
+    """A stock entering or exiting a saved screen after a data refresh"""
+    __tablename__ = "screen_deltas"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    screen_id = Column(Integer, ForeignKey("saved_screens.id"), index=True, nullable=False)
+    symbol = Column(String, nullable=False)
+    change = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
 # Database setup
 def get_engine(database_url: str = "sqlite:///./stocks.db"):
     """Create database engine"""
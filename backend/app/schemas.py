@@ -23,3 +23,29 @@ class HealthResponse(BaseModel):
     """Health check response"""
     status: str
     message: str
+
+
+class SavedScreenRequest(BaseModel):
+    """Request schema for saving a screen"""
+    name: str
+    query: str
+
+
+class SavedScreenResponse(BaseModel):
+    """Saved screen with its current member symbols"""
+    id: int
+    name: str
+    query: Optional[str] = None
+    parsed_json: Dict[str, Any]
+    members: List[str]
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+
+class ScreenDeltaResponse(BaseModel):
+    """A stock entering or exiting a saved screen"""
+    id: int
+    screen_id: int
+    symbol: str
+    change: str
+    created_at: Optional[str] = None
@@ -1,23 +1,29 @@
 """
 LLM Parser Service: Converts natural language queries to structured JSON
 """
+import hashlib
 import json
 import os
-from groq import Groq
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Optional
 from dotenv import load_dotenv
+from app.cache import acquire_lock, release_lock, is_locked
 
 load_dotenv()
 
+# How long parsed queries stay in the shared cache (seconds)
+PARSE_CACHE_TTL = int(os.getenv("PARSE_CACHE_TTL", "86400"))
+
+# How long a worker waits for another worker already parsing the same query
+PARSE_WAIT_TIMEOUT = 15
+
 
 class LLMParser:
     """Service to parse natural language queries into structured JSON"""
     
-    def __init__(self):
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not found in environment variables")
-        self.client = Groq(api_key=api_key)
+    def __init__(self, cache=None):
+        self.cache = cache
+        self._client = None
         
         # Define the schema for stock queries
         self.schema = {
@@ -44,13 +50,39 @@ class LLMParser:
                         "required": ["field", "operator", "value"]
                     }
                 },
+                "group_by": {
+                    "type": "array",
+                    "items": {
+                        "type": "string",
+                        "enum": ["sector", "industry"]
+                    }
+                },
+                "aggregates": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "function": {
+                                "type": "string",
+                                "enum": ["count", "avg", "sum", "min", "max", "median"]
+                            },
+                            "field": {
+                                "type": "string",
+                                "enum": ["price", "market_cap", "volume", "pe_ratio", "dividend_yield"]
+                            },
+                            "alias": {
+                                "type": "string"
+                            }
+                        },
+                        "required": ["function"]
+                    }
+                },
                 "order_by": {
                     "type": "object",
                     "properties": {
                         "field": {
                             "type": "string",
-                            "enum": ["symbol", "company_name", "sector", "price", 
-                                    "market_cap", "volume", "pe_ratio", "dividend_yield"]
+                            "description": "A stock field, or a group_by field / aggregate alias for aggregate queries"
                         },
                         "direction": {
                             "type": "string",
@@ -66,6 +98,17 @@ class LLMParser:
             }
         }
     
+    @property
+    def client(self):
+        """LLM client, created on first use so importing the app stays cheap"""
+        if self._client is None:
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise ValueError("OPENAI_API_KEY not found in environment variables")
+            from groq import Groq
+            self._client = Groq(api_key=api_key)
+        return self._client
+    
     def parse(self, query: str) -> Dict[str, Any]:
         """
         Parse natural language query into structured JSON
@@ -76,6 +119,44 @@ class LLMParser:
         Returns:
             Dictionary containing parsed query structure
         """
+        if self.cache is None:
+            return self._parse_with_llm(query)
+        
+        key = "parse:" + hashlib.sha256(" ".join(query.lower().split()).encode()).hexdigest()
+        cached = self.cache.get(key)
+        if cached is not None:
+            return json.loads(cached)
+        
+        # Only one worker calls the LLM for a given query; the others wait for its result.
+        # Waiting blocks, so async callers must run parse in a thread.
+        token = acquire_lock(self.cache, key, PARSE_WAIT_TIMEOUT)
+        if token is None:
+            cached = self._wait_for(key)
+            if cached is not None:
+                return cached
+        
+        try:
+            result = self._parse_with_llm(query)
+            self.cache.set(key, json.dumps(result), ex=PARSE_CACHE_TTL)
+            return result
+        finally:
+            if token is not None:
+                release_lock(self.cache, key, token)
+    
+    def _wait_for(self, key: str) -> Optional[Dict[str, Any]]:
+        """Poll the shared cache until another worker stores the parse result"""
+        deadline = time.time() + PARSE_WAIT_TIMEOUT
+        while time.time() < deadline:
+            time.sleep(0.1)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return json.loads(cached)
+            if not is_locked(self.cache, key):
+                break
+        return None
+    
+    def _parse_with_llm(self, query: str) -> Dict[str, Any]:
+        """Call the LLM and normalize its JSON response"""
         system_prompt = """You are a query parser for a stock database. 
         Parse the user's natural language query into a structured JSON format.
         
@@ -100,12 +181,29 @@ class LLMParser:
         - like: contains text (for strings)
         - in: value is in a list (use array)
         
+        Aggregate queries (per sector/industry summaries):
+        - group_by: list of fields to group by ("sector", "industry")
+        - aggregates: list of {"function", "field", "alias"} where function is one of
+          count, avg, sum, min, max, median. "field" is a numeric field and may be
+          omitted for count. "alias" defaults to "<function>_<field>" (or "count").
+        - order_by may use a group_by field or an aggregate alias
+        Only use group_by/aggregates when the user asks for totals, averages, counts
+        or other summaries rather than a list of stocks.
+        
         Examples:
         - "Show me stocks with price above $100" -> {"filters": [{"field": "price", "operator": "gt", "value": 100}]}
         - "Find tech stocks" -> {"filters": [{"field": "sector", "operator": "eq", "value": "Technology"}]}
         - "Get stocks where volume is above 1 million and price is between $50 and $200" -> 
           {"filters": [{"field": "volume", "operator": "gt", "value": 1000000}, 
                       {"field": "price", "operator": "between", "value": [50, 200]}]}
+        - "Average PE by sector" ->
+          {"group_by": ["sector"], "aggregates": [{"function": "avg", "field": "pe_ratio", "alias": "avg_pe_ratio"}],
+           "order_by": {"field": "avg_pe_ratio", "direction": "desc"}}
+        - "Total market cap and number of stocks per industry in Technology" ->
+          {"filters": [{"field": "sector", "operator": "eq", "value": "Technology"}],
+           "group_by": ["industry"],
+           "aggregates": [{"function": "sum", "field": "market_cap", "alias": "total_market_cap"},
+                          {"function": "count", "alias": "count"}]}
         
         Return ONLY valid JSON, no additional text."""
         
@@ -135,11 +233,25 @@ class LLMParser:
         normalized = {
             "filters": result.get("filters", []),
             "order_by": result.get("order_by"),
-            "limit": result.get("limit", 100)
+            "group_by": result.get("group_by", []),
+            "aggregates": result.get("aggregates", [])
         }
         
         # Ensure filters is a list
         if not isinstance(normalized["filters"], list):
             normalized["filters"] = []
         
+        # Keep limit only when the query asked for one (the screener defaults to 100),
+        # so ranked queries like "top 10 by market cap" can be told apart
+        if result.get("limit"):
+            normalized["limit"] = result["limit"]
+        
+        # Ensure group_by and aggregates are lists
+        if isinstance(normalized["group_by"], str):
+            normalized["group_by"] = [normalized["group_by"]]
+        if not isinstance(normalized["group_by"], list):
+            normalized["group_by"] = []
+        if not isinstance(normalized["aggregates"], list):
+            normalized["aggregates"] = []
+        
         return normalized
@@ -1,19 +1,27 @@
 """
 Runner Service: Executes SQL queries and returns results
 """
+import hashlib
+import json
+import os
 import time
 from typing import List, Dict, Any
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from app.cache import get_data_version
 from app.models import Stock
 from app.services.screener import Screener
 
+# How long query results stay in the shared cache (seconds)
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", "300"))
+
 
 class Runner:
     """Service to execute SQL queries and return results"""
     
-    def __init__(self):
+    def __init__(self, cache=None):
         self.screener = Screener()
+        self.cache = cache
     
     def execute(self, parsed_json: Dict[str, Any], db_session: Session) -> tuple[List[Dict[str, Any]], float]:
         """
@@ -28,6 +36,15 @@ class Runner:
         """
         start_time = time.time()
         
+        # Results are keyed by data version, so a refresh invalidates them
+        cache_key = None
+        if self.cache is not None:
+            plan = json.dumps(parsed_json, sort_keys=True, default=str)
+            cache_key = f"result:{get_data_version(self.cache)}:" + hashlib.sha256(plan.encode()).hexdigest()
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return json.loads(cached), time.time() - start_time
+        
         try:
             # Build SQLAlchemy query
             query = self.screener.build_sqlalchemy_query(parsed_json, db_session)
@@ -35,6 +52,14 @@ class Runner:
             # Execute query
             stocks = query.all()
             
+            # Aggregate rows are keyed by group field and aggregate alias
+            if self.screener.is_aggregate(parsed_json):
+                results = [dict(row._mapping) for row in stocks]
+                if cache_key:
+                    self.cache.set(cache_key, json.dumps(results), ex=RESULT_CACHE_TTL)
+                execution_time = time.time() - start_time
+                return results, execution_time
+            
             # Convert to dictionaries
             results = []
             for stock in stocks:
@@ -52,6 +77,9 @@ class Runner:
                     "created_at": stock.created_at.isoformat() if stock.created_at else None
                 })
             
+            if cache_key:
+                self.cache.set(cache_key, json.dumps(results), ex=RESULT_CACHE_TTL)
+            
             execution_time = time.time() - start_time
             
             return results, execution_time
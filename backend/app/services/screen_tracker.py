@@ -0,0 +1,176 @@
+"""
+Screen Tracker Service: Saved screens with incremental re-evaluation
+"""
+import os
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+from sqlalchemy.orm import Session
+from app.models import Stock, SavedScreen, ScreenMember, ScreenDelta
+from app.services.screener import Screener
+
+# How long membership deltas are kept (days); older ones are pruned on re-evaluation
+SCREEN_DELTA_RETENTION_DAYS = int(os.getenv("SCREEN_DELTA_RETENTION_DAYS", "7"))
+
+
+class ScreenTracker:
+    """Service to save screens and track their membership as data changes"""
+    
+    def __init__(self):
+        self.screener = Screener()
+    
+    def create(self, name: str, query: str, parsed_json: Dict[str, Any], db_session: Session) -> Dict[str, Any]:
+        """
+        Save a screen and compute its initial members
+        
+        Membership is every stock matching the filters. Ranked screens
+        (order_by with a limit, e.g. "top 10 by market cap") depend on the
+        whole universe and cannot be re-evaluated per row, so they are rejected.
+        
+        Args:
+            name: Screen name
+            query: Original natural language query
+            parsed_json: Parsed JSON query structure
+            db_session: Database session
+        
+        Returns:
+            Dictionary describing the saved screen and its members
+        """
+        if self.screener.is_aggregate(parsed_json):
+            raise ValueError("Aggregate queries cannot be saved as screens")
+        if parsed_json.get("order_by") and parsed_json.get("limit"):
+            raise ValueError("Ranked queries (order_by with limit) cannot be saved as screens")
+        
+        screen = SavedScreen(name=name, query=query, parsed_json=parsed_json)
+        db_session.add(screen)
+        db_session.flush()
+        
+        symbols = [symbol for (symbol,) in self._members_query(parsed_json, db_session)]
+        db_session.add_all(ScreenMember(screen_id=screen.id, symbol=symbol) for symbol in symbols)
+        db_session.commit()
+        
+        return self._to_dict(screen, sorted(symbols))
+    
+    def get(self, screen_id: int, db_session: Session) -> Optional[Dict[str, Any]]:
+        """Return a saved screen with its current members, or None"""
+        screen = db_session.get(SavedScreen, screen_id)
+        if screen is None:
+            return None
+        symbols = [
+            member.symbol for member in
+            db_session.query(ScreenMember).filter(ScreenMember.screen_id == screen_id).order_by(ScreenMember.symbol)
+        ]
+        return self._to_dict(screen, symbols)
+    
+    def exists(self, screen_id: int, db_session: Session) -> bool:
+        """Check whether a saved screen exists"""
+        return db_session.get(SavedScreen, screen_id) is not None
+    
+    def list_all(self, db_session: Session) -> List[Dict[str, Any]]:
+        """Return all saved screens with their current members"""
+        screens = db_session.query(SavedScreen).order_by(SavedScreen.id).all()
+        members = {}
+        for member in db_session.query(ScreenMember).order_by(ScreenMember.symbol):
+            members.setdefault(member.screen_id, []).append(member.symbol)
+        return [self._to_dict(screen, members.get(screen.id, [])) for screen in screens]
+    
+    def delete(self, screen_id: int, db_session: Session) -> bool:
+        """Delete a saved screen with its members and deltas"""
+        screen = db_session.get(SavedScreen, screen_id)
+        if screen is None:
+            return False
+        db_session.query(ScreenMember).filter(ScreenMember.screen_id == screen_id).delete()
+        db_session.query(ScreenDelta).filter(ScreenDelta.screen_id == screen_id).delete()
+        db_session.delete(screen)
+        db_session.commit()
+        return True
+    
+    def reevaluate(self, symbols: List[str], db_session: Session) -> List[Dict[str, Any]]:
+        """
+        Re-check only the changed symbols against every saved screen
+        
+        Each screen's own filter query is run restricted to the changed
+        symbols, so membership uses the same SQL semantics as create() and
+        unchanged rows are never read. Deltas older than
+        SCREEN_DELTA_RETENTION_DAYS are pruned. Changes are flushed, not
+        committed; the caller commits them together with the refreshed rows.
+        
+        Args:
+            symbols: Symbols whose data changed
+            db_session: Database session
+        
+        Returns:
+            List of membership deltas (entered/exited) that were recorded
+        """
+        if not symbols:
+            return []
+        
+        screens = db_session.query(SavedScreen).all()
+        current = {
+            (member.screen_id, member.symbol): member
+            for member in db_session.query(ScreenMember).filter(ScreenMember.symbol.in_(symbols))
+        }
+        
+        now = datetime.utcnow()
+        deltas = []
+        for screen in screens:
+            query = self._members_query(screen.parsed_json, db_session)
+            matching = {symbol for (symbol,) in query.filter(Stock.symbol.in_(symbols))}
+            changed = len(deltas)
+            
+            for symbol in symbols:
+                member = current.get((screen.id, symbol))
+                
+                if symbol in matching and member is None:
+                    db_session.add(ScreenMember(screen_id=screen.id, symbol=symbol))
+                    deltas.append(ScreenDelta(screen_id=screen.id, symbol=symbol, change="entered"))
+                elif symbol not in matching and member is not None:
+                    db_session.delete(member)
+                    deltas.append(ScreenDelta(screen_id=screen.id, symbol=symbol, change="exited"))
+            
+            if len(deltas) > changed:
+                screen.updated_at = now
+        
+        db_session.add_all(deltas)
+        db_session.query(ScreenDelta).filter(
+            ScreenDelta.created_at < now - timedelta(days=SCREEN_DELTA_RETENTION_DAYS)
+        ).delete()
+        db_session.flush()
+        
+        return [self._delta_to_dict(delta) for delta in deltas]
+    
+    def deltas(self, screen_id: int, since_id: int, db_session: Session) -> List[Dict[str, Any]]:
+        """Return membership deltas for a screen recorded after since_id"""
+        deltas = (
+            db_session.query(ScreenDelta)
+            .filter(ScreenDelta.screen_id == screen_id, ScreenDelta.id > since_id)
+            .order_by(ScreenDelta.id)
+            .all()
+        )
+        return [self._delta_to_dict(delta) for delta in deltas]
+    
+    def _members_query(self, parsed_json: Dict[str, Any], db_session: Session):
+        """Query the symbols matching a screen's filters (no ordering or limit)"""
+        plan = {"filters": parsed_json.get("filters", []), "limit": None}
+        return self.screener.build_sqlalchemy_query(plan, db_session).with_entities(Stock.symbol)
+    
+    def _to_dict(self, screen: SavedScreen, symbols: List[str]) -> Dict[str, Any]:
+        """Convert a saved screen to a dictionary"""
+        return {
+            "id": screen.id,
+            "name": screen.name,
+            "query": screen.query,
+            "parsed_json": screen.parsed_json,
+            "members": symbols,
+            "created_at": screen.created_at.isoformat() if screen.created_at else None,
+            "updated_at": screen.updated_at.isoformat() if screen.updated_at else None
+        }
+    
+    def _delta_to_dict(self, delta: ScreenDelta) -> Dict[str, Any]:
+        """Convert a membership delta to a dictionary"""
+        return {
+            "id": delta.id,
+            "screen_id": delta.screen_id,
+            "symbol": delta.symbol,
+            "change": delta.change,
+            "created_at": delta.created_at.isoformat() if delta.created_at else None
+        }
@@ -1,8 +1,8 @@
 """
 Screener Service: Converts structured JSON to SQL queries
 """
-from typing import Dict, Any, List
-from sqlalchemy import text
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import text, func, case, and_
 from app.models import Stock
 
 
@@ -22,6 +22,15 @@ class Screener:
         "dividend_yield": "dividend_yield"
     }
     
+    # Fields that can be used in group_by
+    GROUPABLE_FIELDS = ["sector", "industry"]
+    
+    # Numeric fields that aggregates (other than count) can be applied to
+    NUMERIC_FIELDS = ["price", "market_cap", "volume", "pe_ratio", "dividend_yield"]
+    
+    # Supported aggregate functions
+    AGGREGATE_FUNCTIONS = ["count", "avg", "sum", "min", "max", "median"]
+    
     def __init__(self):
         self.base_table = "stocks"
     
@@ -49,6 +58,11 @@ class Screener:
                 conditions.append(condition)
                 param_counter += 1
         
+        # Aggregate screens (group_by / aggregates) build their own SELECT
+        if self.is_aggregate(parsed_json):
+            sql_query = self._build_aggregate_sql(parsed_json, conditions)
+            return self._format_sql_with_values(sql_query, params)
+        
         # Add WHERE clause if there are conditions
         if conditions:
             query_parts.append("WHERE")
@@ -147,10 +161,35 @@ class Screener:
         Returns:
             SQLAlchemy query object
         """
+        if self.is_aggregate(parsed_json):
+            return self._build_aggregate_query(parsed_json, db_session)
+        
         query = db_session.query(Stock)
         
         # Apply filters
-        filters = parsed_json.get("filters", [])
+        query = self._apply_filters(query, parsed_json.get("filters", []))
+        
+        # Apply ordering
+        order_by = parsed_json.get("order_by")
+        if order_by:
+            field = order_by.get("field")
+            direction = order_by.get("direction", "asc")
+            if field in self.FIELD_MAP:
+                db_field = getattr(Stock, self.FIELD_MAP[field])
+                if direction == "desc":
+                    query = query.order_by(db_field.desc())
+                else:
+                    query = query.order_by(db_field.asc())
+        
+        # Apply limit
+        limit = parsed_json.get("limit", 100)
+        if limit:
+            query = query.limit(limit)
+        
+        return query
+    
+    def _apply_filters(self, query, filters: List[Dict[str, Any]]):
+        """Apply JSON filter items to a SQLAlchemy query"""
         for filter_item in filters:
             field = filter_item.get("field")
             operator = filter_item.get("operator")
@@ -180,17 +219,213 @@ class Screener:
                 if isinstance(value, list):
                     query = query.filter(db_field.in_(value))
         
-        # Apply ordering
+        return query
+    
+    def is_aggregate(self, parsed_json: Dict[str, Any]) -> bool:
+        """Check whether the parsed JSON asks for grouped/aggregated results"""
+        return bool(parsed_json.get("group_by") or parsed_json.get("aggregates"))
+    
+    def _aggregation_spec(self, parsed_json: Dict[str, Any]) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """
+        Validate group_by and aggregates from the parsed JSON
+        
+        Invalid group fields and aggregates are skipped, like invalid filters.
+        If nothing valid remains, a row count per group is returned.
+        
+        Returns:
+            Tuple of (group_by fields, aggregates with function, field and alias)
+        """
+        group_by = parsed_json.get("group_by") or []
+        if isinstance(group_by, str):
+            group_by = [group_by]
+        group_by = [f for f in group_by if f in self.GROUPABLE_FIELDS]
+        
+        aggregates = []
+        aliases = set(group_by)
+        for item in parsed_json.get("aggregates") or []:
+            if not isinstance(item, dict):
+                continue
+            function = str(item.get("function", "")).lower()
+            field = item.get("field")
+            
+            if function not in self.AGGREGATE_FUNCTIONS:
+                continue
+            if function == "count":
+                if field is not None and field not in self.FIELD_MAP:
+                    continue
+            elif field not in self.NUMERIC_FIELDS:
+                continue
+            
+            alias = item.get("alias") or (f"{function}_{field}" if field else function)
+            # Aliases end up as SQL identifiers, so only keep safe ones that
+            # cannot be confused with a stocks column or a median window column
+            if not str(alias).isidentifier() or alias in aliases or alias in self._reserved_aliases():
+                continue
+            aliases.add(alias)
+            
+            aggregates.append({"function": function, "field": field, "alias": alias})
+        
+        if not aggregates:
+            aggregates.append({"function": "count", "field": None, "alias": "count"})
+        
+        return group_by, aggregates
+    
+    def _reserved_aliases(self) -> set:
+        """Names an aggregate alias may not use (columns of the stocks table and subqueries)"""
+        reserved = set(self.FIELD_MAP) | {"id", "created_at"}
+        for field in self.NUMERIC_FIELDS:
+            reserved.update({f"{field}_rn", f"{field}_cnt"})
+        return reserved
+    
+    def _quote(self, identifier: str) -> str:
+        """Quote an alias so SQL keywords such as "order" stay valid identifiers"""
+        return '"' + identifier.replace('"', '""') + '"'
+    
+    def _aggregate_order_field(self, parsed_json: Dict[str, Any], group_by: List[str],
+                               aggregates: List[Dict[str, Any]]) -> Optional[str]:
+        """Return the group field or aggregate alias to order by, if valid"""
         order_by = parsed_json.get("order_by")
-        if order_by:
-            field = order_by.get("field")
-            direction = order_by.get("direction", "asc")
-            if field in self.FIELD_MAP:
+        if not order_by:
+            return None
+        field = order_by.get("field")
+        if field in group_by or field in [agg["alias"] for agg in aggregates]:
+            return field
+        return None
+    
+    def _build_aggregate_sql(self, parsed_json: Dict[str, Any], conditions: List[str]) -> str:
+        """
+        Build a GROUP BY SQL query string
+        
+        Medians have no portable SQL function, so they are computed from
+        ROW_NUMBER()/COUNT() window columns in a filtered subquery.
+        """
+        group_by, aggregates = self._aggregation_spec(parsed_json)
+        group_cols = [self.FIELD_MAP[f] for f in group_by]
+        median_fields = list(dict.fromkeys(
+            agg["field"] for agg in aggregates if agg["function"] == "median"
+        ))
+        
+        select_cols = list(group_cols)
+        for agg in aggregates:
+            function, field = agg["function"], agg["field"]
+            if function == "count" and not field:
+                expr = "COUNT(*)"
+            elif function == "median":
+                col = self.FIELD_MAP[field]
+                expr = (
+                    f"AVG(CASE WHEN {field}_rn BETWEEN ({field}_cnt + 1) / 2 "
+                    f"AND ({field}_cnt + 2) / 2 AND {col} IS NOT NULL THEN {col} END)"
+                )
+            else:
+                expr = f"{function.upper()}({self.FIELD_MAP[field]})"
+            select_cols.append(f"{expr} AS {self._quote(agg['alias'])}")
+        
+        where_clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        if median_fields:
+            windows = []
+            for field in median_fields:
+                col = self.FIELD_MAP[field]
+                partition = ", ".join(group_cols + [f"{col} IS NULL"])
+                windows.append(f"ROW_NUMBER() OVER (PARTITION BY {partition} ORDER BY {col}) AS {field}_rn")
+                windows.append(f"COUNT({col}) OVER (PARTITION BY {partition}) AS {field}_cnt")
+            source = f"(SELECT *, {', '.join(windows)} FROM {self.base_table}{where_clause}) AS filtered"
+        else:
+            source = f"{self.base_table}{where_clause}"
+        
+        query_parts = ["SELECT", ", ".join(select_cols), "FROM", source]
+        
+        if group_cols:
+            query_parts.append(f"GROUP BY {', '.join(group_cols)}")
+        
+        order_field = self._aggregate_order_field(parsed_json, group_by, aggregates)
+        if order_field:
+            direction = parsed_json["order_by"].get("direction", "asc").upper()
+            if order_field in self.FIELD_MAP:
+                order_col = self.FIELD_MAP[order_field]
+            else:
+                order_col = self._quote(order_field)
+            query_parts.append(f"ORDER BY {order_col} {direction}")
+        elif group_cols:
+            query_parts.append(f"ORDER BY {', '.join(group_cols)}")
+        
+        limit = parsed_json.get("limit", 100)
+        if limit:
+            query_parts.append(f"LIMIT {limit}")
+        
+        return " ".join(query_parts)
+    
+    def _build_aggregate_query(self, parsed_json: Dict[str, Any], db_session):
+        """
+        Build a grouped SQLAlchemy query so aggregation runs in the database
+        
+        Rows come back as named tuples keyed by group field and aggregate alias.
+        """
+        group_by, aggregates = self._aggregation_spec(parsed_json)
+        filters = parsed_json.get("filters", [])
+        median_fields = list(dict.fromkeys(
+            agg["field"] for agg in aggregates if agg["function"] == "median"
+        ))
+        
+        if median_fields:
+            # Rank each median field within its group in a filtered subquery
+            needed = list(dict.fromkeys(
+                group_by + [agg["field"] for agg in aggregates if agg["field"]]
+            ))
+            partition = [getattr(Stock, self.FIELD_MAP[f]) for f in group_by]
+            columns = [Stock.id.label("id")]
+            columns += [getattr(Stock, self.FIELD_MAP[f]).label(f) for f in needed]
+            for field in median_fields:
                 db_field = getattr(Stock, self.FIELD_MAP[field])
-                if direction == "desc":
-                    query = query.order_by(db_field.desc())
-                else:
-                    query = query.order_by(db_field.asc())
+                window = {"partition_by": partition + [db_field.is_(None)]}
+                columns.append(func.row_number().over(order_by=db_field, **window).label(f"{field}_rn"))
+                columns.append(func.count(db_field).over(**window).label(f"{field}_cnt"))
+            
+            source = self._apply_filters(db_session.query(*columns), filters).subquery("filtered")
+            column = lambda f: source.c[f]
+        else:
+            source = None
+            column = lambda f: getattr(Stock, self.FIELD_MAP[f])
+        
+        group_cols = [column(f).label(f) for f in group_by]
+        labeled = {}
+        for agg in aggregates:
+            function, field = agg["function"], agg["field"]
+            if function == "count":
+                expr = func.count(column(field)) if field else func.count()
+            elif function == "median":
+                rn, cnt = source.c[f"{field}_rn"], source.c[f"{field}_cnt"]
+                in_middle = and_(
+                    rn >= (cnt + 1) // 2,
+                    rn <= (cnt + 2) // 2,
+                    column(field).isnot(None)
+                )
+                expr = func.avg(case((in_middle, column(field))))
+            else:
+                expr = getattr(func, function)(column(field))
+            labeled[agg["alias"]] = expr.label(agg["alias"])
+        
+        query = db_session.query(*group_cols, *labeled.values())
+        if source is not None:
+            query = query.select_from(source)
+        else:
+            query = self._apply_filters(query.select_from(Stock), filters)
+        
+        if group_by:
+            query = query.group_by(*[column(f) for f in group_by])
+        
+        # Apply ordering on a group field or an aggregate alias
+        order_field = self._aggregate_order_field(parsed_json, group_by, aggregates)
+        if order_field:
+            order_col = labeled.get(order_field)
+            if order_col is None:
+                order_col = column(order_field)
+            if parsed_json["order_by"].get("direction", "asc") == "desc":
+                query = query.order_by(order_col.desc())
+            else:
+                query = query.order_by(order_col.asc())
+        elif group_by:
+            query = query.order_by(*[column(f) for f in group_by])
         
         # Apply limit
         limit = parsed_json.get("limit", 100)
@@ -1,5 +1,4 @@
 
-import yfinance as yf
 from app.models import Stock
 
 def fetch_stock_data(symbols: list[str]) -> list[Stock]:
@@ -12,6 +11,9 @@ def fetch_stock_data(symbols: list[str]) -> list[Stock]:
     Returns:
         List of Stock model instances with fetched data.
     """
+    # yfinance pulls in pandas/numpy, so only load it on the ingestion path
+    import yfinance as yf
+    
     stocks_data = []
     
     for symbol in symbols:
@@ -0,0 +1,16 @@
+"""
+Gunicorn configuration for multi-worker deployments
+
+Run with: gunicorn -c gunicorn.conf.py app.main:app
+"""
+import multiprocessing
+import os
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Workers send no heartbeat until app startup finishes, and startup may seed
+# the database (or wait for another worker to) for up to SEED_TIMEOUT seconds.
+# Keep the worker timeout above that so seeding is never killed midway.
+timeout = int(os.getenv("SEED_TIMEOUT", "300")) + 60
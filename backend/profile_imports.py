@@ -0,0 +1,103 @@
+"""
+Import-time profiling and cold-start budget check for the API process
+
+Usage:
+    python profile_imports.py [--module app.main] [--top 15] [--budget 1.0]
+
+Exits with status 1 if importing the module takes longer than the budget
+or loads a dependency that should stay lazy.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Heavy dependencies that must only load on first use
+LAZY_MODULES = ["groq", "yfinance", "pandas", "numpy"]
+
+# Default cold-start budget in seconds (override with COLD_START_BUDGET)
+DEFAULT_BUDGET = float(os.getenv("COLD_START_BUDGET", "1.0"))
+
+
+def profile_imports(module: str) -> list[tuple[str, int, int]]:
+    """
+    Import a module in a fresh interpreter with -X importtime
+
+    Returns:
+        List of (module name, self time in us, cumulative time in us)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings.append((name.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+
+def measure_cold_start(module: str, runs: int = 3) -> tuple[float, list[str]]:
+    """
+    Measure wall-clock import time of a module in fresh interpreters
+
+    Returns:
+        Tuple of (best import time in seconds, lazy modules that were loaded)
+    """
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"loaded = [m for m in {LAZY_MODULES!r} if m in sys.modules]\n"
+        "print(elapsed, ','.join(loaded))\n"
+    )
+    best = None
+    loaded = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+        elapsed, _, modules = result.stdout.strip().splitlines()[-1].partition(" ")
+        best = float(elapsed) if best is None else min(best, float(elapsed))
+        loaded = [m for m in modules.split(",") if m]
+    return best, loaded
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Profile import time of the API process")
+    parser.add_argument("--module", default="app.main", help="Module to import")
+    parser.add_argument("--top", type=int, default=15, help="Number of modules to list")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="Cold-start budget in seconds")
+    args = parser.parse_args()
+
+    timings = profile_imports(args.module)
+    print(f"Slowest imports for {args.module} (cumulative):")
+    for name, self_us, cumulative_us in sorted(timings, key=lambda t: t[2], reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  (self {self_us / 1000:6.1f} ms)  {name}")
+
+    elapsed, loaded = measure_cold_start(args.module)
+    print(f"\nCold start: {elapsed:.3f}s (budget {args.budget:.3f}s)")
+
+    ok = True
+    if elapsed > args.budget:
+        print("FAIL: cold start is over budget")
+        ok = False
+    if loaded:
+        print(f"FAIL: lazy dependencies loaded at import: {', '.join(loaded)}")
+        ok = False
+    if ok:
+        print("OK")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())